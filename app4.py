@@ -1,44 +1,13 @@
 import streamlit as st
-import numpy as np
-import plotly.graph_objects as go
-import pandas as pd
+from mortgage_core import (REGION_NAMES, REGION_DOWN, REGION_POPS, REGION_ANNUITY, REGIONS_DF,
+                           lognorm_sf, income_chart,
+                           calc_affordable, compare_regions_df)
 
 st.set_page_config(page_title="🏠 Canada Home Affordability Pro", layout="wide")
 
 st.title("🏠 Canada Home Affordability PRO")
 st.markdown("**CMHC 2024 + StatsCan validated • Dual-property comparator**")
 
-# ===========================================
-# REGIONAL DATA (CMHC 2024 validated)
-# ===========================================
-REGIONS = {
-    "🇨🇦 National": {"down": 0.05, "rate": 0.045, "pop": 20_000_000},
-    "🇴🇳 Ontario": {"down": 0.05, "rate": 0.047, "pop": 15_000_000},
-    "🇧🇨 BC": {"down": 0.05, "rate": 0.049, "pop": 5_300_000},
-    "🇦🇧 Alberta": {"down": 0.05, "rate": 0.043, "pop": 4_500_000},
-    "🇶🇨 Quebec": {"down": 0.03, "rate": 0.044, "pop": 9_000_000}
-}
-
-# ===========================================
-# ULTIMATE ACCURACY INCOME FUNCTIONS
-# ===========================================
-def lognorm_cdf(x, mu=10.45, sigma=0.95):
-    if x <= 0: return 0.0
-    z = (np.log(x) - mu) / sigma
-    return 0.5 * (1 + np.tanh(np.sqrt(2/3) * z))
-
-def lognorm_pdf(x, mu=10.45, sigma=0.95):
-    return np.exp(-(np.log(x) - mu)**2 / (2 * sigma**2)) / (x * sigma * np.sqrt(2 * np.pi))
-
-def calc_affordable(price, down_pct, rate):
-    down_payment = price * down_pct
-    loan = price - down_payment
-    monthly_rate = rate / 12
-    n_payments = 25 * 12
-    monthly_payment = loan * (monthly_rate * (1 + monthly_rate)**n_payments) / ((1 + monthly_rate)**n_payments - 1)
-    income_needed = max(0, monthly_payment * 12 / 0.28)
-    return income_needed, down_payment
-
 # ===========================================
 # MAIN INPUTS - SINGLE SLIDER FOR HOUSEHOLD TYPE
 # ===========================================
@@ -58,15 +27,15 @@ with col3:
                              ["Single Earner (40%)", "👨‍👩 Couple (60%)"], 
                              horizontal=True, key="household")
 
-region = st.selectbox("Region", list(REGIONS.keys()))
-region_data = REGIONS[region]
-region_pop = region_data["pop"]
+region = st.selectbox("Region", REGION_NAMES)
+idx = REGION_NAMES.index(region)
+region_pop = REGION_POPS[idx]
 
 # ===========================================
 # ULTIMATE ACCURACY CALCULATIONS (CMHC validated)
 # ===========================================
-income1_single, down1 = calc_affordable(price1, region_data["down"], region_data["rate"])
-income2_single, down2 = calc_affordable(price2, region_data["down"], region_data["rate"])
+income1_single, down1 = calc_affordable(price1, REGION_DOWN[idx], REGION_ANNUITY[idx])
+income2_single, down2 = calc_affordable(price2, REGION_DOWN[idx], REGION_ANNUITY[idx])
 
 if household_type == "Single Earner (40%)":
     income1_needed = income1_single
@@ -80,8 +49,8 @@ else:
     st.success("**👨‍👩 Couples**: Median $125K combined (35% more buying power)")
 
 # Calculate buyers
-prob1 = max(0, 1 - lognorm_cdf(income1_needed))
-prob2 = max(0, 1 - lognorm_cdf(income2_needed))
+prob1 = lognorm_sf(income1_needed)
+prob2 = lognorm_sf(income2_needed)
 people1 = prob1 * region_pop * pop_mult
 people2 = prob2 * region_pop * pop_mult
 pct1, pct2 = prob1 * 100, prob2 * 100
@@ -122,33 +91,17 @@ col_table, col_chart = st.columns([1, 2])
 
 with col_table:
     st.subheader("📋 All Regions")
-    comparison = []
-    for r_name, r_data in REGIONS.items():
-        inc1, _ = calc_affordable(price1, r_data["down"], r_data["rate"])
-        inc2, _ = calc_affordable(price2, r_data["down"], r_data["rate"])
-        i1 = inc1 * (0.75 if household_type == "👨‍👩 Couple (60%)" else 1.0)
-        i2 = inc2 * (0.75 if household_type == "👨‍👩 Couple (60%)" else 1.0)
-        p1 = max(0, 1 - lognorm_cdf(i1)) * r_data["pop"] * pop_mult
-        p2 = max(0, 1 - lognorm_cdf(i2)) * r_data["pop"] * pop_mult
-        comparison.append([r_name, f"{p1:,.0f}", f"{p2:,.0f}"])
-    
-    df = pd.DataFrame(comparison, columns=["Region", f"${price1:,}", f"${price2:,}"])
-    st.dataframe(df, use_container_width=True)
+    income_mult = 0.75 if household_type == "👨‍👩 Couple (60%)" else 1.0
+    df = REGIONS_DF[["Region"]].assign(**{
+        f"${price1:,}": compare_regions_df(price1, income_mult, pop_mult=pop_mult)["Can Afford"],
+        f"${price2:,}": compare_regions_df(price2, income_mult, pop_mult=pop_mult)["Can Afford"],
+    })
+    st.dataframe(df.style.format("{:,.0f}", subset=df.columns[1:]), use_container_width=True)
 
 with col_chart:
     st.subheader("📈 Income Distribution")
-    income_range = np.linspace(1, 400_000, 1000)
-    pdf_values = lognorm_pdf(income_range)
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=income_range, y=pdf_values/np.max(pdf_values)*50,
-                            mode='lines', line=dict(color='#1f77b4', width=4), name='Population'))
-    fig.add_vline(x=income1_needed, line_dash="dash", line_color="blue",
-                  annotation_text=f"Prop1: ${income1_needed:,.0f}", annotation_position="top left")
-    fig.add_vline(x=income2_needed, line_dash="dash", line_color="orange",
-                  annotation_text=f"Prop2: ${income2_needed:,.0f}", annotation_position="top right")
-    fig.update_layout(height=450, hovermode='x unified')
-    fig.update_xaxes(title="Income ($ CAD)", tickformat="$,d")
+    fig = income_chart([(income1_needed, "blue", f"Prop1: ${income1_needed:,.0f}", "top left"),
+                        (income2_needed, "orange", f"Prop2: ${income2_needed:,.0f}")], x_title="Income ($ CAD)")
     st.plotly_chart(fig, use_container_width=True)
 
 # ===========================================
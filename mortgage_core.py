@@ -0,0 +1,197 @@
+"""Shared income-distribution and mortgage kernels for the calculator apps."""
+import math
+import streamlit as st
+import numpy as np
+import plotly.graph_objects as go
+import pandas as pd
+from numba import njit
+from scipy.stats import lognorm
+
+# ===========================================
+# REGIONS - Update rates here
+# ===========================================
+# One array per field, indexed alike - float64 throughout so region math never upcasts
+REGION_NAMES = ("🇨🇦 National", "🇴🇳 Ontario", "🇧🇨 BC", "🇦🇧 Alberta", "🇶🇨 Quebec")
+REGION_DOWN = np.array([0.05, 0.05, 0.05, 0.05, 0.03])
+REGION_RATES = np.array([0.045, 0.047, 0.049, 0.043, 0.044])
+REGION_POPS = np.array([20_000_000, 15_000_000, 5_300_000, 4_500_000, 9_000_000], dtype=np.float64)
+
+# Monthly payment per $ of loan. log1p/expm1 keep (1+m)**n - 1 accurate at low rates
+@njit(cache=True)
+def annuity_factor(rate, n_payments):
+    monthly_rate = rate / 12
+    growth_m1 = np.expm1(n_payments * np.log1p(monthly_rate))
+    return monthly_rate * (growth_m1 + 1) / growth_m1
+
+# 25yr annuity per region - rates are fixed, so pay for it once at import
+REGION_ANNUITY = annuity_factor(REGION_RATES, 300)
+
+REGIONS_DF = pd.DataFrame({"Region": REGION_NAMES, "down": REGION_DOWN, "rate": REGION_RATES, "pop": REGION_POPS})
+
+# ===========================================
+# INCOME DISTRIBUTION (StatsCan lognormal fit)
+# ===========================================
+MU, SIGMA = 10.45, 0.95
+
+# Frozen fit - scipy's sf stays accurate in the upper tail where 1 - cdf rounds to 0
+INCOME_DIST = lognorm(s=SIGMA, scale=math.exp(MU))
+
+# Survival table for the fixed fit - every lookup is one np.interp, built once per process
+_SF_GRID = np.geomspace(1e3, 5e6, 4096)
+_SF_TABLE = INCOME_DIST.sf(_SF_GRID)
+
+def lognorm_sf(x):
+    return np.interp(x, _SF_GRID, _SF_TABLE, left=1.0, right=0.0)
+
+# Plotting grid and density scaled to a 0-50 curve - depends only on the fit.
+# float32 is plenty for screen pixels and halves the payload; region math stays float64
+@st.cache_data
+def pdf_grid():
+    x = np.linspace(1, 400_000, 256, dtype=np.float32)
+    y = INCOME_DIST.pdf(x).astype(np.float32, copy=False)
+    y *= 50.0 / y.max()  # scalar first, then one in-place pass
+    return x, y
+
+# Raw layout dicts for a dashed income marker - same output as add_vline without its per-call validation
+def vline_shape(x, color):
+    return dict(type="line", xref="x", x0=x, x1=x, yref="y domain", y0=0, y1=1,
+                line=dict(color=color, dash="dash"))
+
+def vline_label(x, text, position="top right"):
+    return dict(x=x, xref="x", y=1, yref="y domain", text=text, showarrow=False,
+                xanchor="right" if position == "top left" else "left", yanchor="top")
+
+# Per-run chart built from the cached grid: copying a cached figure revalidates all of it,
+# which costs more than building the trace fresh.
+# markers are (x, color, label[, position]) tuples; extra_shapes go in after them as-is
+def income_chart(markers, extra_shapes=(), x_title="Income ($)", height=450, hovermode='x unified', **layout):
+    income, density = pdf_grid()
+    fig = go.Figure(go.Scattergl(x=income, y=density, mode='lines', line=dict(color='#1f77b4', width=4), name='Population'))
+    fig.update_xaxes(title=x_title, tickformat="$,d")
+    fig.update_layout(height=height, hovermode=hovermode, **layout,
+                      shapes=[vline_shape(x, color) for x, color, *_ in markers] + list(extra_shapes),
+                      annotations=[vline_label(x, *label) for x, _, *label in markers])
+    return fig
+
+# ===========================================
+# 28% GDS MORTGAGE CALCULATOR
+# ===========================================
+# Not cached: with the annuity precomputed this is a few multiplies, cheaper than a cache lookup
+def calc_affordable(price, down_pct, annuity):
+    down_payment = price * down_pct
+    loan = price - down_payment
+    monthly_payment = loan * annuity
+    income_needed = np.maximum(0, monthly_payment * 12 / 0.28)
+    return income_needed, down_payment
+
+def compare_regions_df(price, income_mult=1.0, qualify_mult=1.0, pop_mult=1.0):
+    # income_mult scales the displayed income, qualify_mult only the income tested against the distribution
+    inc, _ = calc_affordable(price, REGION_DOWN, REGION_ANNUITY)
+    inc = inc * income_mult
+    prob = lognorm_sf(inc * qualify_mult)
+    return REGIONS_DF[["Region"]].assign(**{
+        "Min Income": inc,
+        "Can Afford": prob * REGION_POPS * pop_mult,
+        "% Pop": prob * 100,
+    })
+
+# Display formats for compare_regions_df - keeps the frame numeric for sorting
+REGION_TABLE_FORMAT = {"Min Income": "${:,.0f}", "Can Afford": "{:,.0f}", "% Pop": "{:.1f}%"}
+
+# ===========================================
+# REAL DOWN PAYMENT CALCULATION (CMHC Rules)
+# ===========================================
+@njit(cache=True)
+def calculate_down_payment(price):
+    if price <= 500000:
+        return price * 0.05
+    elif price <= 1500000:
+        first_500k = 500000 * 0.05
+        above_500k = (price - 500000) * 0.10
+        return first_500k + above_500k
+    else:
+        return price * 0.20  # Over $1.5M = 20% minimum
+
+# ===========================================
+# REAL MORTGAGE CALCULATION (Stress Test)
+# ===========================================
+@njit(cache=True)
+def calc_stress_test_payment(price, contract_rate, first_time_buyer, new_construction):
+    down_payment = calculate_down_payment(price)
+    loan = price - down_payment
+
+    # Stress test rate: max(5.25%, contract_rate + 2%)
+    stress_rate = max(0.0525, contract_rate + 0.02)
+
+    # Amortization: 30yr for first-time/new builds, 25yr otherwise
+    if first_time_buyer or new_construction:
+        amortization_years = 30
+    else:
+        amortization_years = 25
+
+    monthly_payment = loan * annuity_factor(stress_rate, amortization_years * 12)
+    income_needed = monthly_payment * 12 / 0.39  # 39% GDS
+
+    return income_needed, down_payment, stress_rate, amortization_years
+
+# Batched stress test: P prices x R rates -> (income, down, stress rate, amortization), each (P, R).
+# CMHC tiers run once per price and the stress annuity once per rate, not once per cell
+@njit(cache=True)
+def calc_stress_test_payments(prices, rates, first_time_buyer, new_construction):
+    shape = (prices.size, rates.size)
+    income_needed = np.empty(shape)
+    down_payment = np.empty(shape)
+    stress_rate = np.empty(shape)
+    amortization_years = np.empty(shape)
+
+    years = 30 if first_time_buyer or new_construction else 25
+    stress = np.empty(rates.size)
+    annuity = np.empty(rates.size)
+    for r in range(rates.size):
+        stress[r] = max(0.0525, rates[r] + 0.02)
+        annuity[r] = annuity_factor(stress[r], years * 12)
+
+    for p in range(prices.size):
+        down = calculate_down_payment(prices[p])
+        loan = prices[p] - down
+        for r in range(rates.size):
+            monthly_payment = loan * annuity[r]
+            income_needed[p, r] = monthly_payment * 12 / 0.39  # 39% GDS
+            down_payment[p, r] = down
+            stress_rate[p, r] = stress[r]
+            amortization_years[p, r] = years
+
+    return income_needed, down_payment, stress_rate, amortization_years
+
+# Buyers per (price, region) in one native pass: stress-test income -> survival lookup -> population.
+# Same table and end clamps as lognorm_sf (numba's np.interp has no left/right), so the table
+# agrees with the headline metrics everywhere
+@njit(cache=True, fastmath=True)
+def _region_buyers_kernel(prices, rates, pops, hh_mult, pop_mult, first_time_buyer, new_construction,
+                          sf_grid, sf_table):
+    income = calc_stress_test_payments(prices, rates, first_time_buyer, new_construction)[0]
+    out = np.empty(income.shape)
+    for p in range(prices.size):
+        for r in range(rates.size):
+            x = income[p, r] * hh_mult
+            if x <= sf_grid[0]:
+                sf = 1.0
+            elif x >= sf_grid[-1]:
+                sf = 0.0
+            else:
+                sf = np.interp(x, sf_grid, sf_table)
+            out[p, r] = sf * pops[r] * pop_mult
+    return out
+
+def region_buyers(price1, price2, first_time_buyer, new_construction, hh_mult, pop_mult):
+    prices = np.array([price1, price2], dtype=np.float64)
+    return _region_buyers_kernel(prices, REGION_RATES, REGION_POPS, float(hh_mult), float(pop_mult),
+                                 first_time_buyer, new_construction, _SF_GRID, _SF_TABLE)
+
+# Pay the JIT compile once per server process, not on the first rerun
+@st.cache_resource
+def _warm_kernels():
+    calc_stress_test_payment(500_000, 0.05, True, False)
+    region_buyers(500_000, 500_000, True, False, 1.0, 1.0)
+
+_warm_kernels()